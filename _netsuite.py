@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Shared NetSuite helpers for the FieldPay debug and OAuth test scripts.
+"""
+
+import json
+from urllib.parse import quote
+
+try:
+    import orjson
+    
+    def pretty(data):
+        """Pretty-print JSON-compatible data."""
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def pretty(data):
+        """Pretty-print JSON-compatible data."""
+        return json.dumps(data, indent=2)
+
+# Error codes NetSuite puts in its error bodies, matched on the raw bytes
+ERROR_TOKENS = [b'INVALID_LOGIN', b'TOKEN_EXPIRED', b'INSUFFICIENT_PERMISSION', b'USER_ERROR']
+
+def detect_error_codes(body):
+    """Return the known NetSuite error codes found in a raw response body, without decoding it."""
+    return [token.decode() for token in ERROR_TOKENS if token in body]
+
+def encode_params(params):
+    """Percent-encode OAuth query parameters in one pass over the dict."""
+    # quote() hands back unreserved-only values untouched after a C-level scan,
+    # so only the redirect URI and scope pay for escaping
+    return "&".join(f"{quote(key, safe='')}={quote(str(value), safe='')}" for key, value in params.items())
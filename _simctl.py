@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Shared iOS simulator helpers for the FieldPay debug scripts.
+Capability probes are cached so repeated checks in one run don't re-spawn simctl.
+"""
+
+import functools
+import os
+import re
+import subprocess
+import time
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+DEVICE = "iPhone 16"
+BUNDLE_ID = "Fieldpay.fieldpay"
+
+@functools.lru_cache(maxsize=None)
+def device_names():
+    """Return the names of all simulator devices known to simctl."""
+    result = subprocess.run(
+        ["xcrun", "simctl", "list", "devices", "--json"],
+        capture_output=True,
+        check=True
+    )
+    
+    devices = json_loads(result.stdout)["devices"]
+    return frozenset(device["name"] for runtime in devices.values() for device in runtime)
+
+def have_device(name=DEVICE):
+    """Check for a simulator device by exact name, so "iPhone 16 Pro" is not "iPhone 16"."""
+    return name in device_names()
+
+@functools.lru_cache(maxsize=None)
+def have_app(bundle_id=BUNDLE_ID, device=DEVICE):
+    """Check if an app is installed on a simulator device."""
+    # get_app_container exits non-zero when the bundle ID is not installed,
+    # so there is no app listing to scan
+    result = subprocess.run(
+        ["xcrun", "simctl", "get_app_container", device, bundle_id],
+        capture_output=True
+    )
+    return result.returncode == 0
+
+def check_simulator_status():
+    """Check if iPhone 16 simulator is available, printing the result."""
+    try:
+        if have_device(DEVICE):
+            print("✅ iPhone 16 simulator found")
+            return True
+        else:
+            print("❌ iPhone 16 simulator not found")
+            print("Available devices:")
+            for name in sorted(device_names()):
+                print(f"   {name}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Error checking simulator status: {e}")
+        return False
+
+def check_app_installed():
+    """Check if FieldPay app is installed on simulator, printing the result."""
+    try:
+        if have_app(BUNDLE_ID, DEVICE):
+            print("✅ FieldPay app found on simulator")
+            return True
+        else:
+            print("❌ FieldPay app not found on simulator")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Error checking app installation: {e}")
+        return False
+
+class SimulatorShell:
+    """A long-lived /bin/sh inside the simulator, so each command skips the simctl spawn cost."""
+    
+    def __init__(self, device=DEVICE):
+        self.process = subprocess.Popen(
+            ["xcrun", "simctl", "spawn", device, "/bin/sh"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True
+        )
+        self.commands_run = 0
+        self.exit_output = ""
+    
+    def _exited(self, output=""):
+        """Build the error for a shell that has gone away, including what simctl printed."""
+        # stderr is merged into stdout, so whatever is left explains the exit
+        self.exit_output += output + self.process.stdout.read()
+        status = self.process.wait()
+        return RuntimeError(f"Simulator shell exited with status {status}: {self.exit_output.strip()}")
+    
+    def run(self, command):
+        """Run a shell command and return (exit status, combined stdout/stderr)."""
+        if self.process.poll() is not None:
+            raise self._exited()
+        
+        self.commands_run += 1
+        sentinel = f"__DONE_{self.commands_run}__"
+        
+        # The sentinel marks the end of this command's output and carries its exit status
+        try:
+            self.process.stdin.write(f"{{ {command}; }} 2>&1; echo {sentinel} $?\n")
+            self.process.stdin.flush()
+        except BrokenPipeError:
+            raise self._exited() from None
+        
+        output = []
+        for line in self.process.stdout:
+            if sentinel in line:
+                before, _, status = line.partition(sentinel)
+                output.append(before)
+                return int(status), "".join(output)
+            output.append(line)
+        
+        raise self._exited("".join(output))
+    
+    def close(self):
+        """Let the shell exit and wait for it."""
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            # The shell already exited, so unflushed input has nowhere to go
+            pass
+        self.process.wait()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def open_log_stream(device=DEVICE, process_name="fieldpay"):
+    """Start streaming a simulator process's logs as raw bytes."""
+    cmd = [
+        "xcrun", "simctl", "spawn", device, "log", "stream",
+        "--predicate", f'process == "{process_name}"',
+        "--style", "compact"
+    ]
+    
+    return subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        bufsize=0
+    )
+
+def matching_log_lines(process, pattern):
+    """Yield (timestamp, raw_line) for each streamed log line matching a bytes pattern."""
+    
+    # Timestamp prefix is only re-formatted when the wall-clock second changes
+    last_second = 0
+    last_prefix = ""
+    
+    fd = process.stdout.fileno()
+    buffer = bytearray()
+    
+    while buffer is not None:
+        chunk = os.read(fd, 65536)
+        if chunk:
+            # Keep any trailing partial line until the next chunk completes it
+            buffer += chunk
+            *raw_lines, buffer = buffer.split(b"\n")
+        else:
+            # End of stream: whatever is left is the final, unterminated line
+            raw_lines, buffer = [buffer] if buffer else [], None
+        
+        for raw_line in raw_lines:
+            if not pattern.search(raw_line):
+                continue
+            
+            now = time.time()
+            second = int(now)
+            if second != last_second:
+                last_prefix = time.strftime('%H:%M:%S', time.localtime(second))
+                last_second = second
+            yield f"{last_prefix}.{int((now - second) * 1000):03d}", bytes(raw_line)
+
+def keyword_pattern(keywords, patterns=()):
+    """Compile literal keywords and regex patterns into one case-insensitive bytes pattern."""
+    # One search per raw log line replaces a substring test per keyword
+    return re.compile(
+        "|".join([re.escape(keyword) for keyword in keywords] + list(patterns)).encode(),
+        re.IGNORECASE
+    )
+
+def highlight_matcher(highlights):
+    """Return a function giving the message for the highest-priority highlight in a raw log line.
+    
+    Priority follows the order of the highlights dict, like the old if/elif chains.
+    """
+    priority = {token: rank for rank, token in enumerate(highlights)}
+    
+    # The lookahead reports every position a token starts at, so overlapping tokens are all seen
+    pattern = re.compile(
+        b"(?=(" + b"|".join(re.escape(token) for token in highlights) + b"))",
+        re.IGNORECASE
+    )
+    
+    def match(raw_line):
+        hits = {hit.group(1).lower() for hit in pattern.finditer(raw_line)}
+        return highlights[min(hits, key=priority.__getitem__)] if hits else None
+    
+    return match
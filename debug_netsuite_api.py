@@ -4,183 +4,323 @@ NetSuite API Debug Script
 This script helps debug NetSuite API integration issues by testing API calls directly.
 """
 
+import argparse
 import requests
+import itertools
 import json
+import os
 import sys
-from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from requests.adapters import HTTPAdapter
 
-def test_netsuite_api():
-    """Test NetSuite API calls to identify issues"""
+from _netsuite import detect_error_codes, pretty
+
+try:
+    try:
+        import ijson.backends.yajl2_c as ijson
+    except ImportError:
+        import ijson
+    from ijson.common import JSONError
     
-    print("🔍 NetSuite API Debug Script")
-    print("=" * 50)
+    # parse() event that opens a top-level value, by the JSON type it names
+    JSON_TYPES = {'start_map': 'object', 'start_array': 'array', 'string': 'string',
+                  'number': 'number', 'boolean': 'boolean', 'null': 'null'}
     
-    # Get configuration from user
-    print("\n📋 Configuration:")
-    account_id = input("Enter your NetSuite Account ID: ").strip()
-    access_token = input("Enter your NetSuite Access Token: ").strip()
+    def first_list_item(response):
+        """Stream a list response up to its first record.
+        
+        Returns (first record or None, None) for a body with an items array, or
+        (None, description of the body's shape) when there is no items array.
+        """
+        response.raw.decode_content = True
+        events = ijson.parse(response.raw, use_float=True)
+        
+        _, event, _ = next(events)
+        if event != 'start_map':
+            return None, f"body is a JSON {JSON_TYPES.get(event, event)}"
+        
+        keys = []
+        for prefix, event, value in events:
+            if prefix == 'items' and event == 'start_array':
+                # Hand the rest of the stream to items() so only the first record is built
+                records = ijson.items(itertools.chain([(prefix, event, value)], events), 'items.item')
+                return next(records, None), None
+            if prefix == '' and event == 'map_key':
+                keys.append(value)
+        return None, f"top-level keys {keys}"
+except ImportError:
+    # requests raises a ValueError subclass for bodies it cannot decode
+    JSONError = ValueError
     
-    if not account_id or not access_token:
-        print("❌ Error: Account ID and Access Token are required")
-        return
+    JSON_TYPES = {dict: 'object', list: 'array', str: 'string', int: 'number',
+                  float: 'number', bool: 'boolean', type(None): 'null'}
     
-    base_url = f"https://{account_id}.suitetalk.api.netsuite.com"
+    def first_list_item(response):
+        """Decode a list response and return (first record or None, None), or
+        (None, description of the body's shape) when there is no items array."""
+        data = response.json()
+        if not isinstance(data, dict):
+            return None, f"body is a JSON {JSON_TYPES[type(data)]}"
+        items = data.get('items')
+        if not isinstance(items, list):
+            return None, f"top-level keys {list(data)}"
+        return (items[0] if items else None), None
+
+try:
+    import simdjson
     
-    print(f"\n🌐 Base URL: {base_url}")
-    print(f"🔑 Access Token: {access_token[:20]}...")
+    # Reused across calls so simdjson can keep its internal buffers warm
+    JSON_PARSER = simdjson.Parser()
+    JSON_OBJECT, JSON_ARRAY = simdjson.Object, simdjson.Array
     
-    # Test 1: Connection test
-    print("\n🧪 Test 1: Connection Test")
-    print("-" * 30)
+    def parse_json(body):
+        """Parse a JSON body lazily, decoding values only as they are accessed"""
+        return JSON_PARSER.parse(body)
+    
+    def as_python(doc):
+        """Convert a parsed document into plain Python objects"""
+        if isinstance(doc, JSON_OBJECT):
+            return doc.as_dict()
+        if isinstance(doc, JSON_ARRAY):
+            return doc.as_list()
+        return doc
+except ImportError:
+    JSON_OBJECT, JSON_ARRAY = dict, list
+    parse_json = json.loads
+    
+    def as_python(doc):
+        """Convert a parsed document into plain Python objects"""
+        return doc
+
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+def format_json(data, full=False):
+    """Render JSON for display, compact and truncated unless the full dump is requested"""
+    
+    if full:
+        return pretty(data)
+    return json.dumps(data, separators=(',', ':'))[:2048]
+
+def report_error_body(response, options):
+    """Print the known error codes in an error response, and the body itself when verbose"""
+    
+    body = response.content
+    hits = detect_error_codes(body)
+    print(f"🔎 Detected: {', '.join(hits) if hits else 'unknown error'}")
+    
+    if options.verbose:
+        print(f"📄 Error response: {body[:2048].decode('utf-8', errors='replace')}")
+    elif not hits:
+        print("💡 Re-run with --verbose to see the response body")
+
+def summarize_json_body(response, full=False):
+    """Print the structure of a JSON response body"""
     
     try:
-        # Test with a simple endpoint
-        test_url = f"{base_url}/services/rest/record/v1/customer?limit=1"
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/json"
-        }
-        
-        print(f"📡 Making request to: {test_url}")
-        response = requests.get(test_url, headers=headers, timeout=30)
+        doc = parse_json(response.content)
         
-        print(f"📊 Response Status: {response.status_code}")
-        print(f"📋 Response Headers: {dict(response.headers)}")
+        if isinstance(doc, JSON_OBJECT):
+            print(f"📄 Response structure: {list(doc.keys())}")
+            field_types = {k: type(v).__name__ for k, v in doc.items()}
+            print(f"📄 Field types: {field_types}")
+            items = doc.get('items')
+            if isinstance(items, JSON_ARRAY):
+                print(f"📊 Number of items: {len(items)}")
+                if items and isinstance(items[0], JSON_OBJECT) and 'id' in items[0]:
+                    print(f"📋 First item ID: {items[0]['id']}")
         
-        if response.status_code == 200:
-            print("✅ Connection successful!")
-            try:
-                data = response.json()
-                print(f"📄 Response data: {json.dumps(data, indent=2)}")
-            except json.JSONDecodeError:
-                print(f"⚠️  Response is not valid JSON: {response.text}")
-        else:
-            print(f"❌ Connection failed with status {response.status_code}")
-            print(f"📄 Error response: {response.text}")
-            
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Request failed: {e}")
-        return
+        print(f"📄 Response data: {format_json(as_python(doc), full)}")
+    except ValueError:
+        print(f"⚠️  Response is not valid JSON: {response.text}")
+
+def check_json_prefix(response):
+    """Check that a streamed response starts with parseable JSON without draining it"""
     
-    # Test 2: Customer endpoint
-    print("\n🧪 Test 2: Customer Endpoint")
-    print("-" * 30)
+    # A limit=1 page fits comfortably in the first 4 KiB
+    prefix = response.raw.read(4096, decode_content=True).decode("utf-8", errors="replace")
+    response.close()
     
     try:
-        customer_url = f"{base_url}/services/rest/record/v1/customer"
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/json"
-        }
-        
-        print(f"📡 Making request to: {customer_url}")
-        response = requests.get(customer_url, headers=headers, timeout=30)
-        
-        print(f"📊 Response Status: {response.status_code}")
-        
-        if response.status_code == 200:
-            print("✅ Customer endpoint successful!")
-            try:
-                data = response.json()
-                print(f"📄 Response structure: {list(data.keys()) if isinstance(data, dict) else 'Not a dict'}")
-                
-                if isinstance(data, dict):
-                    if 'items' in data:
-                        print(f"📊 Number of customers: {len(data['items'])}")
-                        if data['items']:
-                            print(f"📋 First customer: {json.dumps(data['items'][0], indent=2)}")
-                    else:
-                        print(f"📄 Full response: {json.dumps(data, indent=2)}")
-                else:
-                    print(f"📄 Response is not a dict: {type(data)}")
-                    print(f"📄 Response: {data}")
-                    
-            except json.JSONDecodeError:
-                print(f"⚠️  Response is not valid JSON: {response.text}")
+        json.JSONDecoder().raw_decode(prefix)
+        print("✅ Response body is valid JSON")
+    except json.JSONDecodeError:
+        print(f"⚠️  Response is not valid JSON: {prefix[:200]}")
+
+def report_connection(response, options):
+    """Report the result of the HEAD connection probe"""
+    
+    print(f"📋 Content-Type: {response.headers.get('content-type')}")
+    
+    check_body = None
+    if not 200 <= response.status_code < 300:
+        # A HEAD response has no body, so re-issue a GET to see what the server
+        # actually says; on success only its first bytes are inspected
+        if response.status_code == 405:
+            print("⚠️  HEAD not allowed, retrying with GET")
         else:
-            print(f"❌ Customer endpoint failed with status {response.status_code}")
-            print(f"📄 Error response: {response.text}")
+            print(f"⚠️  HEAD returned {response.status_code}, retrying with GET for the response body")
+        response = SESSION.get(response.url, timeout=30, stream=True)
+        print(f"📊 Response Status: {response.status_code}")
+        check_body = check_json_prefix
+    elif response.status_code == 200 and options.verbose:
+        response = SESSION.get(response.url, timeout=30)
+        check_body = partial(summarize_json_body, full=options.full)
+    
+    if response.status_code == 200:
+        print("✅ Connection successful!")
+        if check_body:
+            check_body(response)
+        return True
+    
+    print(f"❌ Connection failed with status {response.status_code}")
+    report_error_body(response, options)
+    return False
+
+def report_list(response, options, item_name):
+    """Report a NetSuite list endpoint by streaming its first record"""
+    
+    if response.status_code == 200:
+        print(f"✅ {item_name.capitalize()} endpoint successful!")
+        try:
+            first_item, shape = first_list_item(response)
             
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Request failed: {e}")
+            if shape is not None:
+                # Not an empty list: the body isn't the list shape NetSuite normally returns
+                print(f"⚠️  Response has no items array ({shape})")
+            elif first_item is not None:
+                print(f"📋 First {item_name}: {format_json(first_item, options.full)}")
+            else:
+                print(f"⚠️  No {item_name}s found in response")
+                
+        except JSONError:
+            print("⚠️  Response is not valid JSON")
+        return True
+    
+    print(f"❌ {item_name.capitalize()} endpoint failed with status {response.status_code}")
+    report_error_body(response, options)
+    return False
+
+def report_permissions(response, options):
+    """Report whether the token can read account information"""
+    
+    if response.status_code == 200:
+        print("✅ Account endpoint accessible - good permissions!")
+        return True
     
-    # Test 3: Invoice endpoint
-    print("\n🧪 Test 3: Invoice Endpoint")
+    if response.status_code == 403:
+        print("❌ Permission denied - check your OAuth scopes")
+        print("Required scopes: restlets, rest_webservices")
+    else:
+        print(f"⚠️  Account endpoint returned status {response.status_code}")
+    report_error_body(response, options)
+    return False
+
+def fetch(method, url):
+    """Issue a probe request through the shared session"""
+    return SESSION.request(method, url, timeout=30, stream=True, allow_redirects=True)
+
+# (title, HTTP method, path, report function); the connection test runs
+# first, and the run stops if that request cannot be made at all
+CONNECTION_TEST = ("Connection Test", "HEAD", "/services/rest/record/v1/customer?limit=1", report_connection)
+ENDPOINTS = [
+    ("Customer Endpoint", "GET", "/services/rest/record/v1/customer", partial(report_list, item_name="customer")),
+    ("Invoice Endpoint", "GET", "/services/rest/record/v1/invoice", partial(report_list, item_name="invoice")),
+    ("Permissions Check", "GET", "/services/rest/record/v1/account", report_permissions),
+]
+
+def run_test(number, endpoint, base_url, options, future=None):
+    """Run one endpoint test, returning False if the request could not be made"""
+    
+    title, method, path, report = endpoint
+    print(f"\n🧪 Test {number}: {title}")
     print("-" * 30)
     
+    url = f"{base_url}{path}"
     try:
-        invoice_url = f"{base_url}/services/rest/record/v1/invoice"
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/json"
-        }
-        
-        print(f"📡 Making request to: {invoice_url}")
-        response = requests.get(invoice_url, headers=headers, timeout=30)
-        
-        print(f"📊 Response Status: {response.status_code}")
-        
-        if response.status_code == 200:
-            print("✅ Invoice endpoint successful!")
-            try:
-                data = response.json()
-                print(f"📄 Response structure: {list(data.keys()) if isinstance(data, dict) else 'Not a dict'}")
-                
-                if isinstance(data, dict):
-                    if 'items' in data:
-                        print(f"📊 Number of invoices: {len(data['items'])}")
-                        if data['items']:
-                            print(f"📋 First invoice: {json.dumps(data['items'][0], indent=2)}")
-                    else:
-                        print(f"📄 Full response: {json.dumps(data, indent=2)}")
-                else:
-                    print(f"📄 Response is not a dict: {type(data)}")
-                    print(f"📄 Response: {data}")
-                    
-            except json.JSONDecodeError:
-                print(f"⚠️  Response is not valid JSON: {response.text}")
+        if future:
+            # Already sent alongside the other tests; wait for its response
+            print(f"📡 Request sent to: {url}")
+            response = future.result()
         else:
-            print(f"❌ Invoice endpoint failed with status {response.status_code}")
-            print(f"📄 Error response: {response.text}")
-            
+            print(f"📡 Making request to: {url}")
+            response = fetch(method, url)
+        with response:
+            print(f"📊 Response Status: {response.status_code}")
+            report(response, options)
+        return True
+        
     except requests.exceptions.RequestException as e:
         print(f"❌ Request failed: {e}")
+        return False
+
+def test_netsuite_api(options):
+    """Test NetSuite API calls to identify issues"""
     
-    # Test 4: Check permissions
-    print("\n🧪 Test 4: Permissions Check")
-    print("-" * 30)
+    print("🔍 NetSuite API Debug Script")
+    print("=" * 50)
     
-    try:
-        # Try to get account information
-        account_url = f"{base_url}/services/rest/record/v1/account"
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/json"
-        }
-        
-        print(f"📡 Making request to: {account_url}")
-        response = requests.get(account_url, headers=headers, timeout=30)
-        
-        print(f"📊 Response Status: {response.status_code}")
+    # Get configuration from the command line, environment, or user
+    print("\n📋 Configuration:")
+    account_id = options.account_id
+    access_token = options.access_token
+    
+    if sys.stdin.isatty():
+        if not account_id:
+            account_id = input("Enter your NetSuite Account ID: ").strip()
+        if not access_token:
+            access_token = input("Enter your NetSuite Access Token: ").strip()
+    
+    if not account_id or not access_token:
+        print("❌ Error: Account ID and Access Token are required")
+        return
+    
+    base_url = f"https://{account_id}.suitetalk.api.netsuite.com"
+    
+    # Pinned on the session so every request reuses them; update "Authorization" if the token rotates
+    SESSION.headers.update({
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/json"
+    })
+    
+    print(f"\n🌐 Base URL: {base_url}")
+    print(f"🔑 Access Token: {access_token[:20]}...")
+    
+    if not run_test(1, CONNECTION_TEST, base_url, options):
+        return
+    
+    if options.sync:
+        for number, endpoint in enumerate(ENDPOINTS, start=2):
+            run_test(number, endpoint, base_url, options)
+        return
+    
+    with ThreadPoolExecutor(max_workers=len(ENDPOINTS)) as executor:
+        # The remaining probes are independent, so overlap their round trips and report in order
+        futures = [
+            executor.submit(fetch, method, f"{base_url}{path}")
+            for _, method, path, _ in ENDPOINTS
+        ]
         
-        if response.status_code == 200:
-            print("✅ Account endpoint accessible - good permissions!")
-        elif response.status_code == 403:
-            print("❌ Permission denied - check your OAuth scopes")
-            print("Required scopes: restlets, rest_webservices")
-        else:
-            print(f"⚠️  Account endpoint returned status {response.status_code}")
-            print(f"📄 Response: {response.text}")
-            
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Request failed: {e}")
+        for number, (endpoint, future) in enumerate(zip(ENDPOINTS, futures), start=2):
+            run_test(number, endpoint, base_url, options, future)
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Debug NetSuite API integration issues")
+    parser.add_argument("--account-id", default=os.environ.get("NETSUITE_ACCOUNT_ID"),
+                        help="NetSuite account ID (default: $NETSUITE_ACCOUNT_ID)")
+    parser.add_argument("--access-token", default=os.environ.get("NETSUITE_ACCESS_TOKEN"),
+                        help="OAuth access token (default: $NETSUITE_ACCESS_TOKEN)")
+    parser.add_argument("--verbose", action="store_true", help="fetch and summarize full response bodies, including errors")
+    parser.add_argument("--full", action="store_true", help="pretty-print JSON without truncating it")
+    parser.add_argument("--sync", action="store_true", help="send the test requests one at a time")
+    args = parser.parse_args()
+    
     print("🚀 Starting NetSuite API Debug...")
     
     try:
-        test_netsuite_api()
+        test_netsuite_api(args)
     except KeyboardInterrupt:
         print("\n⏹️  Debug interrupted by user")
     except Exception as e:
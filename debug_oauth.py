@@ -4,12 +4,35 @@ OAuth Debug Monitor for FieldPay iOS App
 This script monitors iOS simulator logs to help debug OAuth flow issues.
 """
 
-import subprocess
 import sys
-import time
-import re
 from datetime import datetime
 
+from _simctl import (
+    check_app_installed, check_simulator_status, highlight_matcher, keyword_pattern,
+    matching_log_lines, open_log_stream
+)
+
+# Keywords to look for in OAuth flow
+OAUTH_KEYWORDS = [
+    "OAuth", "NetSuite", "token", "authorization", "callback",
+    "URL", "Safari", "redirect", "code", "access_token",
+    "refresh_token", "error", "ERROR", "Debug", "FRESH",
+    "UIOpenURLAction", "SceneClient", "FrontBoard"
+]
+
+OAUTH_PATTERN = keyword_pattern(OAUTH_KEYWORDS)
+
+# Messages for important events, keyed by the lowercased token that triggers them,
+# in priority order for lines that contain several
+HIGHLIGHTS = {
+    b"uiopenurlaction": "🔄 OAuth Callback Detected!",
+    b"error": "❌ Error Detected!",
+    b"token": "🔑 Token Activity Detected!",
+    b"safari": "🌐 Safari Activity Detected!"
+}
+
+highlight_for = highlight_matcher(HIGHLIGHTS)
+
 def run_log_monitor():
     """Monitor iOS simulator logs for OAuth-related activity."""
     
@@ -19,54 +42,24 @@ def run_log_monitor():
     print("Press Ctrl+C to stop monitoring")
     print("=" * 50)
     
-    # Command to monitor logs with comprehensive filtering
-    cmd = [
-        "xcrun", "simctl", "spawn", "iPhone 16", "log", "stream",
-        "--predicate", 'process == "fieldpay"',
-        "--style", "compact"
-    ]
-    
+    process = None
     try:
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-            bufsize=1
-        )
-        
-        # Keywords to look for in OAuth flow
-        oauth_keywords = [
-            "OAuth", "NetSuite", "token", "authorization", "callback",
-            "URL", "Safari", "redirect", "code", "access_token",
-            "refresh_token", "error", "ERROR", "Debug", "FRESH",
-            "UIOpenURLAction", "SceneClient", "FrontBoard"
-        ]
+        process = open_log_stream()
         
         print(f"📱 Monitoring started at {datetime.now().strftime('%H:%M:%S')}")
         print("🔍 Looking for OAuth-related logs...")
         print("-" * 50)
         
-        while True:
-            line = process.stdout.readline()
-            if not line:
-                break
-                
-            # Check if line contains any OAuth-related keywords
-            if any(keyword.lower() in line.lower() for keyword in oauth_keywords):
-                timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                print(f"[{timestamp}] {line.strip()}")
+        # Only lines containing OAuth-related keywords are yielded
+        for timestamp, raw_line in matching_log_lines(process, OAUTH_PATTERN):
+            line = raw_line.decode("utf-8", "replace")
+            print(f"[{timestamp}] {line.strip()}")
+            
+            # Special highlighting for important events
+            highlight = highlight_for(raw_line)
+            if highlight:
+                print(highlight)
                 
-                # Special highlighting for important events
-                if "UIOpenURLAction" in line:
-                    print("🔄 OAuth Callback Detected!")
-                elif "ERROR" in line or "error" in line:
-                    print("❌ Error Detected!")
-                elif "token" in line.lower():
-                    print("🔑 Token Activity Detected!")
-                elif "Safari" in line:
-                    print("🌐 Safari Activity Detected!")
-                    
     except KeyboardInterrupt:
         print("\n🛑 Monitoring stopped by user")
         if process:
@@ -76,48 +69,6 @@ def run_log_monitor():
         if process:
             process.terminate()
 
-def check_simulator_status():
-    """Check if iPhone 16 simulator is available and running."""
-    try:
-        result = subprocess.run(
-            ["xcrun", "simctl", "list", "devices"],
-            capture_output=True,
-            text=True
-        )
-        
-        if "iPhone 16" in result.stdout:
-            print("✅ iPhone 16 simulator found")
-            return True
-        else:
-            print("❌ iPhone 16 simulator not found")
-            print("Available devices:")
-            print(result.stdout)
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error checking simulator status: {e}")
-        return False
-
-def check_app_installed():
-    """Check if FieldPay app is installed on simulator."""
-    try:
-        result = subprocess.run(
-            ["xcrun", "simctl", "listapps", "iPhone 16"],
-            capture_output=True,
-            text=True
-        )
-        
-        if "Fieldpay.fieldpay" in result.stdout:
-            print("✅ FieldPay app found on simulator")
-            return True
-        else:
-            print("❌ FieldPay app not found on simulator")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error checking app installation: {e}")
-        return False
-
 def main():
     """Main function to run the OAuth debug monitor."""
     print("🔧 FieldPay OAuth Debug Tool")
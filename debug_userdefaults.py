@@ -4,12 +4,48 @@ UserDefaults Debug Monitor for FieldPay iOS App
 This script monitors iOS simulator logs to help debug UserDefaults storage issues.
 """
 
-import subprocess
 import sys
-import time
-import re
 from datetime import datetime
 
+from _simctl import (
+    check_app_installed, check_simulator_status, highlight_matcher, keyword_pattern,
+    matching_log_lines, open_log_stream
+)
+
+# Literal keywords to look for in UserDefaults operations
+USERDEFAULTS_KEYWORDS = [
+    "UserDefaults", "netsuite_access_token", "netsuite_refresh_token", 
+    "netsuite_token_expiry", "netsuite_client_id", "netsuite_client_secret",
+    "netsuite_account_id", "netsuite_redirect_uri", "netsuite_code_verifier",
+    "netsuite_oauth_state", "storeTokens", "loadStoredTokens", 
+    "clearStoredTokens", "updateConfiguration", "configure"
+]
+
+# Debug log patterns, matched as regular expressions
+USERDEFAULTS_PATTERNS = [
+    "Debug.*save", "Debug.*load", "Debug.*store", "Debug.*clear",
+    "Debug.*UserDefaults", "Debug.*token", "Debug.*configured",
+    "Debug.*OAuthManager", "Debug.*NetSuiteAPI", "Debug.*isConfigured"
+]
+
+USERDEFAULTS_PATTERN = keyword_pattern(USERDEFAULTS_KEYWORDS, USERDEFAULTS_PATTERNS)
+
+# Messages for important events, keyed by the lowercased token that triggers them,
+# in priority order for lines that contain several
+HIGHLIGHTS = {
+    b"storetokens": "💾 Token Storage Detected!",
+    b"loadstoredtokens": "📂 Token Loading Detected!",
+    b"clearstoredtokens": "🗑️ Token Clearing Detected!",
+    b"netsuite_access_token": "🔑 Access Token Operation Detected!",
+    b"netsuite_refresh_token": "🔄 Refresh Token Operation Detected!",
+    b"isconfigured": "⚙️ Configuration Check Detected!",
+    b"error": "❌ Error Detected!",
+    "✅".encode(): "✅ Success Detected!",
+    "❌".encode(): "❌ Failure Detected!"
+}
+
+highlight_for = highlight_matcher(HIGHLIGHTS)
+
 def run_userdefaults_monitor():
     """Monitor iOS simulator logs for UserDefaults-related activity."""
     
@@ -19,68 +55,24 @@ def run_userdefaults_monitor():
     print("Press Ctrl+C to stop monitoring")
     print("=" * 50)
     
-    # Command to monitor logs with comprehensive filtering
-    cmd = [
-        "xcrun", "simctl", "spawn", "iPhone 16", "log", "stream",
-        "--predicate", 'process == "fieldpay"',
-        "--style", "compact"
-    ]
-    
+    process = None
     try:
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-            bufsize=1
-        )
-        
-        # Keywords to look for in UserDefaults operations
-        userdefaults_keywords = [
-            "UserDefaults", "netsuite_access_token", "netsuite_refresh_token", 
-            "netsuite_token_expiry", "netsuite_client_id", "netsuite_client_secret",
-            "netsuite_account_id", "netsuite_redirect_uri", "netsuite_code_verifier",
-            "netsuite_oauth_state", "storeTokens", "loadStoredTokens", 
-            "clearStoredTokens", "updateConfiguration", "configure",
-            "Debug.*save", "Debug.*load", "Debug.*store", "Debug.*clear",
-            "Debug.*UserDefaults", "Debug.*token", "Debug.*configured",
-            "Debug.*OAuthManager", "Debug.*NetSuiteAPI", "Debug.*isConfigured"
-        ]
+        process = open_log_stream()
         
         print(f"📱 Monitoring started at {datetime.now().strftime('%H:%M:%S')}")
         print("🔍 Looking for UserDefaults-related logs...")
         print("-" * 50)
         
-        while True:
-            line = process.stdout.readline()
-            if not line:
-                break
-                
-            # Check if line contains any UserDefaults-related keywords
-            if any(keyword.lower() in line.lower() for keyword in userdefaults_keywords):
-                timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                print(f"[{timestamp}] {line.strip()}")
+        # Only lines containing UserDefaults-related keywords are yielded
+        for timestamp, raw_line in matching_log_lines(process, USERDEFAULTS_PATTERN):
+            line = raw_line.decode("utf-8", "replace")
+            print(f"[{timestamp}] {line.strip()}")
+            
+            # Special highlighting for important events
+            highlight = highlight_for(raw_line)
+            if highlight:
+                print(highlight)
                 
-                # Special highlighting for important events
-                if "storeTokens" in line:
-                    print("💾 Token Storage Detected!")
-                elif "loadStoredTokens" in line:
-                    print("📂 Token Loading Detected!")
-                elif "clearStoredTokens" in line:
-                    print("🗑️ Token Clearing Detected!")
-                elif "netsuite_access_token" in line:
-                    print("🔑 Access Token Operation Detected!")
-                elif "netsuite_refresh_token" in line:
-                    print("🔄 Refresh Token Operation Detected!")
-                elif "isConfigured" in line:
-                    print("⚙️ Configuration Check Detected!")
-                elif "ERROR" in line or "error" in line:
-                    print("❌ Error Detected!")
-                elif "✅" in line:
-                    print("✅ Success Detected!")
-                elif "❌" in line:
-                    print("❌ Failure Detected!")
-                    
     except KeyboardInterrupt:
         print("\n🛑 Monitoring stopped by user")
         if process:
@@ -90,48 +82,6 @@ def run_userdefaults_monitor():
         if process:
             process.terminate()
 
-def check_simulator_status():
-    """Check if iPhone 16 simulator is available and running."""
-    try:
-        result = subprocess.run(
-            ["xcrun", "simctl", "list", "devices"],
-            capture_output=True,
-            text=True
-        )
-        
-        if "iPhone 16" in result.stdout:
-            print("✅ iPhone 16 simulator found")
-            return True
-        else:
-            print("❌ iPhone 16 simulator not found")
-            print("Available devices:")
-            print(result.stdout)
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error checking simulator status: {e}")
-        return False
-
-def check_app_installed():
-    """Check if FieldPay app is installed on simulator."""
-    try:
-        result = subprocess.run(
-            ["xcrun", "simctl", "listapps", "iPhone 16"],
-            capture_output=True,
-            text=True
-        )
-        
-        if "Fieldpay.fieldpay" in result.stdout:
-            print("✅ FieldPay app found on simulator")
-            return True
-        else:
-            print("❌ FieldPay app not found on simulator")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error checking app installation: {e}")
-        return False
-
 def main():
     """Main function to run the UserDefaults debug monitor."""
     print("🔧 FieldPay UserDefaults Debug Tool")
@@ -3,17 +3,21 @@
 Quick NetSuite API Test - OAuth 2.0 Version
 """
 
+import argparse
 import requests
 import json
 import sys
 import os
 
-def quick_test():
+from _netsuite import detect_error_codes, pretty
+
+def quick_test(account_id=None, access_token=None, verbose=False):
     print("🔍 Quick NetSuite API Test (OAuth 2.0)")
     print("=" * 45)
     
-    # Get credentials
-    account_id = input("Enter NetSuite Account ID: ").strip()
+    # Get credentials, prompting only when running interactively
+    if not account_id and sys.stdin.isatty():
+        account_id = input("Enter NetSuite Account ID: ").strip()
     
     if not account_id:
         print("❌ Missing Account ID")
@@ -29,12 +33,13 @@ def quick_test():
     url = f"https://{account_id}.restlets.api.netsuite.com/rest/platform/v1/record/customer"
     
     # For OAuth testing, we need the access token from the app
-    print("\n📱 To get your access token:")
-    print("1. Open the FieldPay app")
-    print("2. Go to Settings → OAuth Troubleshooting")
-    print("3. Copy the Access Token value")
-    
-    access_token = input("\nEnter Access Token from app: ").strip()
+    if not access_token and sys.stdin.isatty():
+        print("\n📱 To get your access token:")
+        print("1. Open the FieldPay app")
+        print("2. Go to Settings → OAuth Troubleshooting")
+        print("3. Copy the Access Token value")
+        
+        access_token = input("\nEnter Access Token from app: ").strip()
     
     if not access_token:
         print("❌ Missing access token")
@@ -68,16 +73,26 @@ def quick_test():
             else:
                 print("⚠️  No customer records found in response")
                 print("🔍 Response structure:")
-                print(json.dumps(data, indent=2)[:500] + "...")
+                print(pretty(data)[:500] + "...")
                 
-        elif response.status_code == 401:
-            print("❌ Authentication failed - OAuth token may be expired")
-            print("💡 Try refreshing the token in the app")
-        elif response.status_code == 403:
-            print("❌ Permission denied - check your NetSuite permissions")
         else:
-            print(f"❌ Error: {response.status_code}")
-            print(f"Response: {response.text[:200]}...")
+            body = response.content
+            hits = detect_error_codes(body)
+            
+            if response.status_code == 401:
+                if "TOKEN_EXPIRED" in hits:
+                    print("❌ Authentication failed - OAuth token has expired")
+                else:
+                    print("❌ Authentication failed - OAuth token may be expired")
+                print("💡 Try refreshing the token in the app")
+            elif response.status_code == 403:
+                print("❌ Permission denied - check your NetSuite permissions")
+            else:
+                print(f"❌ Error: {response.status_code}")
+            
+            print(f"🔎 Detected: {', '.join(hits) if hits else 'unknown error'}")
+            if verbose:
+                print(f"Response: {body[:200].decode('utf-8', errors='replace')}...")
             
     except requests.exceptions.Timeout:
         print("❌ Request timed out")
@@ -88,4 +103,12 @@ def quick_test():
         print(f"Raw response: {response.text[:200]}...")
 
 if __name__ == "__main__":
-    quick_test() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Quick NetSuite API test using an OAuth 2.0 access token")
+    parser.add_argument("--account-id", default=os.environ.get("NETSUITE_ACCOUNT_ID"),
+                        help="NetSuite account ID (default: $NETSUITE_ACCOUNT_ID)")
+    parser.add_argument("--access-token", default=os.environ.get("NETSUITE_ACCESS_TOKEN"),
+                        help="OAuth access token from the app (default: $NETSUITE_ACCESS_TOKEN)")
+    parser.add_argument("--verbose", action="store_true", help="print the body of error responses")
+    args = parser.parse_args()
+    
+    quick_test(args.account_id, args.access_token, verbose=args.verbose) 
\ No newline at end of file
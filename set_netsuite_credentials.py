@@ -4,10 +4,9 @@ Set NetSuite OAuth Credentials in UserDefaults
 This script manually sets the NetSuite OAuth credentials for testing.
 """
 
+import shlex
 import subprocess
 import sys
-import time
-from datetime import datetime
 
 def set_netsuite_credentials():
     """Set NetSuite OAuth credentials in UserDefaults."""
@@ -27,21 +26,37 @@ def set_netsuite_credentials():
     
     for key, value in credentials.items():
         print(f"   Setting {key}: {value[:10]}... (length: {len(value)})")
-        
-        try:
-            # Write to UserDefaults
-            cmd = [
-                "xcrun", "simctl", "spawn", "iPhone 16",
-                "defaults", "write", "Fieldpay.fieldpay", key, value
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    
+    # Write every key from a single simulator spawn; each spawn costs hundreds of ms
+    script = " && ".join(
+        f"defaults write Fieldpay.fieldpay {shlex.quote(key)} {shlex.quote(value)}"
+        for key, value in credentials.items()
+    )
+    batch_cmd = ["xcrun", "simctl", "spawn", "iPhone 16", "/bin/sh", "-c", script]
+    batch_result = subprocess.run(batch_cmd, capture_output=True, text=True)
+    
+    if batch_result.returncode == 0:
+        for key in credentials:
             print(f"   ✅ {key} set successfully")
-            
-        except subprocess.CalledProcessError as e:
-            print(f"   ❌ Failed to set {key}: {e}")
-            print(f"   Error output: {e.stderr}")
-            return False
+    else:
+        # Fall back to one write per key so the failing key can be reported
+        print("   ⚠️  Batched write failed, retrying one key at a time")
+        
+        for key, value in credentials.items():
+            try:
+                # Write to UserDefaults
+                cmd = [
+                    "xcrun", "simctl", "spawn", "iPhone 16",
+                    "defaults", "write", "Fieldpay.fieldpay", key, value
+                ]
+                
+                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+                print(f"   ✅ {key} set successfully")
+                
+            except subprocess.CalledProcessError as e:
+                print(f"   ❌ Failed to set {key}: {e}")
+                print(f"   Error output: {e.stderr}")
+                return False
     
     print("\n✅ All NetSuite credentials set successfully!")
     
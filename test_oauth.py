@@ -3,8 +3,9 @@
 Test script to generate and validate NetSuite OAuth URLs
 """
 
-import urllib.parse
-from urllib.parse import urlparse
+import sys
+
+from _netsuite import encode_params
 
 def test_oauth_url():
     # Configuration
@@ -16,8 +17,11 @@ def test_oauth_url():
     code_challenge = "test_challenge"
     code_challenge_method = "S256"
     
-    # NetSuite OAuth 2.0 authorization endpoint
-    base_url = f"https://{account_id}.app.netsuite.com/app/login/oauth2/authorize.nl"
+    # NetSuite OAuth 2.0 authorization endpoint, kept in parts for the URL analysis below
+    scheme = "https"
+    netloc = f"{account_id}.app.netsuite.com"
+    path = "/app/login/oauth2/authorize.nl"
+    base_url = f"{scheme}://{netloc}{path}"
     
     # Build query parameters
     params = {
@@ -31,58 +35,65 @@ def test_oauth_url():
     }
     
     # Construct full URL
-    query_string = urllib.parse.urlencode(params)
+    query_string = encode_params(params)
     full_url = f"{base_url}?{query_string}"
     
-    print("=== NetSuite OAuth URL Test ===")
-    print(f"Account ID: {account_id}")
-    print(f"Client ID: {client_id}")
-    print(f"Redirect URI: {redirect_uri}")
-    print(f"Base URL: {base_url}")
-    print(f"Full OAuth URL: {full_url}")
+    lines = []
+    lines.append("=== NetSuite OAuth URL Test ===")
+    lines.append(f"Account ID: {account_id}")
+    lines.append(f"Client ID: {client_id}")
+    lines.append(f"Redirect URI: {redirect_uri}")
+    lines.append(f"Base URL: {base_url}")
+    lines.append(f"Full OAuth URL: {full_url}")
     
-    # Parse and analyze the URL
-    parsed = urlparse(full_url)
-    print("\n=== URL Analysis ===")
-    print(f"Scheme: {parsed.scheme}")
-    print(f"Netloc: {parsed.netloc}")
-    print(f"Path: {parsed.path}")
-    print(f"Query: {parsed.query}")
+    # Analyze the URL from the components it was built from
+    lines.append("\n=== URL Analysis ===")
+    lines.append(f"Scheme: {scheme}")
+    lines.append(f"Netloc: {netloc}")
+    lines.append(f"Path: {path}")
+    lines.append(f"Query: {query_string}")
     
     # Check for common issues
-    print("\n=== Common Issues Check ===")
+    lines.append("\n=== Common Issues Check ===")
     if not account_id or account_id == "1234567":
-        print("❌ Account ID is missing or using placeholder value")
+        lines.append("❌ Account ID is missing or using placeholder value")
     else:
-        print("✅ Account ID looks valid")
+        lines.append("✅ Account ID looks valid")
         
     if not client_id or client_id == "your_client_id_here":
-        print("❌ Client ID is missing or using placeholder value")
+        lines.append("❌ Client ID is missing or using placeholder value")
     else:
-        print("✅ Client ID looks valid")
+        lines.append("✅ Client ID looks valid")
         
-    if redirect_uri.startswith("fieldpay://"):
-        print("✅ Redirect URI format looks correct")
+    # Custom schemes don't parse reliably with urlparse, so inspect the raw string
+    redirect_scheme, _, redirect_rest = redirect_uri.partition("://")
+    if redirect_scheme != "fieldpay":
+        lines.append("❌ Redirect URI should use the fieldpay:// scheme")
+    elif "callback" not in redirect_rest:
+        lines.append("❌ Redirect URI should point at the app's callback path")
     else:
-        print("❌ Redirect URI format may be incorrect")
+        lines.append("✅ Redirect URI format looks correct")
     
-    print("\n=== Recommendations ===")
-    print("1. Make sure your NetSuite account ID is correct")
-    print("2. Verify your Client ID and Client Secret in NetSuite")
-    print("3. Check that the redirect URI matches exactly in NetSuite app settings")
-    print("4. For sandbox testing, use sandbox URLs")
-    print("5. Ensure your NetSuite app has the correct scopes enabled")
+    lines.append("\n=== Recommendations ===")
+    lines.append("1. Make sure your NetSuite account ID is correct")
+    lines.append("2. Verify your Client ID and Client Secret in NetSuite")
+    lines.append("3. Check that the redirect URI matches exactly in NetSuite app settings")
+    lines.append("4. For sandbox testing, use sandbox URLs")
+    lines.append("5. Ensure your NetSuite app has the correct scopes enabled")
     
     # Test token exchange URL
     token_url = f"https://{account_id}.suitetalk.api.netsuite.com/services/rest/auth/oauth2/v1/token"
-    print(f"\n=== Token Exchange URL Test ===")
-    print(f"Token URL: {token_url}")
+    lines.append(f"\n=== Token Exchange URL Test ===")
+    lines.append(f"Token URL: {token_url}")
+    
+    lines.append("\n=== Next Steps ===")
+    lines.append("1. Update the credentials in this script with your actual values")
+    lines.append("2. Run the script to verify URL generation")
+    lines.append("3. Test the generated URL in a browser")
+    lines.append("4. Check the iOS app logs for OAuth callback handling")
     
-    print("\n=== Next Steps ===")
-    print("1. Update the credentials in this script with your actual values")
-    print("2. Run the script to verify URL generation")
-    print("3. Test the generated URL in a browser")
-    print("4. Check the iOS app logs for OAuth callback handling")
+    # Emit the whole report with one write
+    sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     test_oauth_url() 
\ No newline at end of file
@@ -6,87 +6,111 @@ Test script to validate NetSuite OAuth authorization URL generation
 import urllib.parse
 import hashlib
 import base64
+import functools
 import secrets
-import string
+import time
+
+from _netsuite import encode_params
+
+try:
+    from fast_query_parsers import parse_query_string
+except ImportError:
+    def parse_query_string(query, separator):
+        """Stdlib stand-in for fast_query_parsers.parse_query_string"""
+        return urllib.parse.parse_qsl(query.decode(), separator=separator)
+
+def _split_url(url):
+    """Split a URL into scheme, netloc and path without building a ParseResult"""
+    scheme, _, rest = url.partition("://")
+    netloc, slash, path = rest.partition("/")
+    return scheme, netloc, slash + path.partition("?")[0]
+
+REQUIRED_PARAMS = {'response_type', 'client_id', 'redirect_uri', 'scope', 'state', 'code_challenge', 'code_challenge_method'}
 
 def generate_code_verifier():
     """Generate a random code verifier for PKCE"""
-    allowed_chars = string.ascii_letters + string.digits + '-._~'
-    length = secrets.randbelow(86) + 43  # 43-128 characters
-    return ''.join(secrets.choice(allowed_chars) for _ in range(length))
+    # 96 random bytes encode to exactly 128 base64url characters (the RFC 7636
+    # maximum), all of which are in the PKCE unreserved set
+    return secrets.token_urlsafe(96)
 
 def generate_code_challenge(code_verifier):
     """Generate code challenge from code verifier using SHA256"""
-    sha256_hash = hashlib.sha256(code_verifier.encode('utf-8')).digest()
-    return base64.urlsafe_b64encode(sha256_hash).decode('utf-8').rstrip('=')
+    # The verifier is unreserved ASCII only, so skip the UTF-8 encoder
+    sha256_hash = hashlib.sha256(code_verifier.encode('ascii'), usedforsecurity=True).digest()
+    return base64.urlsafe_b64encode(sha256_hash).rstrip(b'=').decode('ascii')
 
 def generate_state():
     """Generate a random state parameter"""
-    import time
-    timestamp = int(time.time())
-    return f"{secrets.token_urlsafe(16)}_{timestamp}"
+    return f"{secrets.token_urlsafe(16)}_{time.time_ns() // 1_000_000_000}"
 
-def build_authorization_url(account_id, client_id, redirect_uri):
-    """Build NetSuite OAuth 2.0 authorization URL"""
-    
-    # Generate PKCE parameters
-    code_verifier = generate_code_verifier()
-    code_challenge = generate_code_challenge(code_verifier)
-    state = generate_state()
+@functools.lru_cache(maxsize=32)
+def _authorization_url_prefix(account_id, client_id, redirect_uri):
+    """Build the part of the authorization URL that is fixed for a given app"""
     
     # Base URL
     base_url = f"https://{account_id}.app.netsuite.com/app/login/oauth2/authorize.nl"
     
-    # Query parameters
-    params = {
+    # Query parameters that don't change between authorization requests
+    static_query = encode_params({
         'response_type': 'code',
         'client_id': client_id,
         'redirect_uri': redirect_uri,
         'scope': 'restlets rest_webservices',
-        'state': state,
-        'code_challenge': code_challenge,
         'code_challenge_method': 'S256'
-    }
+    })
+    
+    return f"{base_url}?{static_query}"
+
+def build_authorization_url(account_id, client_id, redirect_uri):
+    """Build NetSuite OAuth 2.0 authorization URL"""
+    
+    # Generate PKCE parameters
+    code_verifier = generate_code_verifier()
+    code_challenge = generate_code_challenge(code_verifier)
+    state = generate_state()
     
-    # Build URL
-    query_string = urllib.parse.urlencode(params)
-    auth_url = f"{base_url}?{query_string}"
+    # Build URL; state and code_challenge are base64url text, so they need no quoting
+    prefix = _authorization_url_prefix(account_id, client_id, redirect_uri)
+    auth_url = f"{prefix}&state={state}&code_challenge={code_challenge}"
     
     return auth_url, code_verifier, state
 
+@functools.lru_cache(maxsize=256)
 def validate_url(url):
     """Validate the generated authorization URL"""
     try:
-        parsed = urllib.parse.urlparse(url)
+        scheme, netloc, path = _split_url(url)
+        query = url.partition("?")[2]
         
         # Check scheme
-        if parsed.scheme != 'https':
+        if scheme != 'https':
             return False, "URL must use HTTPS"
         
         # Check domain
-        if 'netsuite.com' not in parsed.netloc:
+        if 'netsuite.com' not in netloc:
             return False, "URL must be a NetSuite domain"
         
         # Check path
-        if not parsed.path.endswith('/app/login/oauth2/authorize.nl'):
+        if not path.endswith('/app/login/oauth2/authorize.nl'):
             return False, "Invalid authorization endpoint path"
         
-        # Check required parameters
-        query_params = urllib.parse.parse_qs(parsed.query)
-        required_params = ['response_type', 'client_id', 'redirect_uri', 'scope', 'state', 'code_challenge', 'code_challenge_method']
+        # Check required parameters; reversed so the first occurrence of a repeated key wins.
+        # fast_query_parsers keeps blank values where parse_qsl drops them, so an empty
+        # value counts as missing either way
+        query_params = dict(reversed(parse_query_string(query.encode(), "&")))
+        missing_params = {param for param in REQUIRED_PARAMS if not query_params.get(param)}
         
-        for param in required_params:
-            if param not in query_params:
-                return False, f"Missing required parameter: {param}"
+        if missing_params:
+            return False, f"Missing required parameter(s): {', '.join(sorted(missing_params))}"
         
         # Check specific parameter values
-        if query_params['response_type'][0] != 'code':
+        if query_params['response_type'] != 'code':
             return False, "response_type must be 'code'"
         
-        if query_params['code_challenge_method'][0] != 'S256':
+        if query_params['code_challenge_method'] != 'S256':
             return False, "code_challenge_method must be 'S256'"
         
-        if query_params['scope'][0] != 'restlets rest_webservices':
+        if query_params['scope'] != 'restlets rest_webservices':
             return False, "scope must be 'restlets rest_webservices'"
         
         return True, "URL is valid"
@@ -129,16 +153,15 @@ def main():
     print()
     
     # Test URL parsing
-    parsed = urllib.parse.urlparse(auth_url)
-    query_params = urllib.parse.parse_qs(parsed.query)
+    scheme, netloc, path = _split_url(auth_url)
+    query_params = urllib.parse.parse_qs(auth_url.partition("?")[2])
     
     print(f"URL Components:")
-    print(f"  Scheme: {parsed.scheme}")
-    print(f"  Netloc: {parsed.netloc}")
-    print(f"  Path: {parsed.path}")
+    print(f"  Scheme: {scheme}")
+    print(f"  Netloc: {netloc}")
+    print(f"  Path: {path}")
     print(f"  Query Parameters:")
-    for key, values in query_params.items():
-        print(f"    {key}: {values[0]}")
+    print("\n".join(f"    {key}: {values[0]}" for key, values in query_params.items()))
     
     print()
     print("=== Test Complete ===")
@@ -3,88 +3,88 @@
 Test saving settings to UserDefaults
 """
 
-import subprocess
-import sys
+import shlex
 
-def test_save_settings():
+from _simctl import BUNDLE_ID, SimulatorShell
+
+def defaults_command(action, *args):
+    """Build a quoted `defaults` command for the FieldPay domain"""
+    return " ".join(["defaults", action, BUNDLE_ID] + [shlex.quote(arg) for arg in args])
+
+def test_save_settings(shell):
     """Test saving some settings to UserDefaults"""
     print("🧪 Testing UserDefaults Save Mechanism")
     print("=" * 40)
     
     # Test saving a simple setting
     try:
-        result = subprocess.run([
-            'xcrun', 'simctl', 'spawn', 'iPhone 16', 
-            'defaults', 'write', 'Fieldpay.fieldpay', 'test_setting', 'test_value'
-        ], capture_output=True, text=True)
+        status, output = shell.run(defaults_command("write", "test_setting", "test_value"))
         
-        if result.returncode == 0:
+        if status == 0:
             print("✅ Successfully saved test setting")
             
             # Now try to read it back
-            read_result = subprocess.run([
-                'xcrun', 'simctl', 'spawn', 'iPhone 16', 
-                'defaults', 'read', 'Fieldpay.fieldpay', 'test_setting'
-            ], capture_output=True, text=True)
+            read_status, read_output = shell.run(defaults_command("read", "test_setting"))
             
-            if read_result.returncode == 0:
-                print(f"✅ Successfully read back: {read_result.stdout.strip()}")
+            if read_status == 0:
+                print(f"✅ Successfully read back: {read_output.strip()}")
             else:
-                print(f"❌ Failed to read back: {read_result.stderr}")
-                
+                print(f"❌ Failed to read back: {read_output}")
+        
         else:
-            print(f"❌ Failed to save test setting: {result.stderr}")
-            
+            print(f"❌ Failed to save test setting: {output}")
+    
     except Exception as e:
         print(f"❌ Error: {e}")
 
-def save_netsuite_settings():
+def save_netsuite_settings(shell):
     """Save NetSuite settings manually"""
     print("\n🔧 Manually Saving NetSuite Settings")
     print("=" * 40)
     
     settings = {
         'netsuite_client_id': 'test_client_id',
-        'netsuite_client_secret': 'test_client_secret', 
+        'netsuite_client_secret': 'test_client_secret',
         'netsuite_account_id': 'test_account_id',
         'netsuite_redirect_uri': 'fieldpay://callback'
     }
     
+    # Each write goes through the already-running simulator shell, so reporting
+    # per key no longer costs a simctl spawn per key
     for key, value in settings.items():
         try:
-            result = subprocess.run([
-                'xcrun', 'simctl', 'spawn', 'iPhone 16', 
-                'defaults', 'write', 'Fieldpay.fieldpay', key, value
-            ], capture_output=True, text=True)
+            status, output = shell.run(defaults_command("write", key, value))
             
-            if result.returncode == 0:
+            if status == 0:
                 print(f"✅ Saved {key}")
             else:
-                print(f"❌ Failed to save {key}: {result.stderr}")
-                
+                print(f"❌ Failed to save {key}: {output}")
+        
         except Exception as e:
             print(f"❌ Error saving {key}: {e}")
 
 def main():
-    test_save_settings()
-    save_netsuite_settings()
-    
-    print("\n🔍 Now checking if settings were saved...")
     try:
-        result = subprocess.run([
-            'xcrun', 'simctl', 'spawn', 'iPhone 16', 
-            'defaults', 'read', 'Fieldpay.fieldpay'
-        ], capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print("✅ UserDefaults domain exists!")
-            print("📋 Contents:")
-            print(result.stdout)
-        else:
-            print(f"❌ UserDefaults domain still doesn't exist: {result.stderr}")
+        with SimulatorShell() as shell:
+            test_save_settings(shell)
+            save_netsuite_settings(shell)
             
-    except Exception as e:
-        print(f"❌ Error reading UserDefaults: {e}")
+            print("\n🔍 Now checking if settings were saved...")
+            try:
+                status, output = shell.run(defaults_command("read"))
+                
+                if status == 0:
+                    print("✅ UserDefaults domain exists!")
+                    print("📋 Contents:")
+                    print(output)
+                else:
+                    print(f"❌ UserDefaults domain still doesn't exist: {output}")
+            
+            except Exception as e:
+                print(f"❌ Error reading UserDefaults: {e}")
+    
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Error running the simulator shell: {e}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()